@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency Load Test
+Raises the number of in-flight scenarios against the product, stock and
+transaction endpoints until p99 latency or error rate crosses a target, then
+backs off (AIMD or gradient control). Reports the knee of the
+throughput/latency curve for each endpoint group and how many cashiers one
+backend instance can serve at that point.
+All three groups use the lib/api.js endpoints, so point --base-url at that API.
+"""
+
+import argparse
+import copy
+import math
+import threading
+import time
+import uuid
+
+import requests
+
+from backend_test import ProductManagementTester
+from perf_utils import as_list, format_ms, summarize, unwrap
+from traffic_replay import RecordingSession
+
+GROUPS = ['product', 'stock', 'transaction']
+
+DEFAULT_TIMEOUT = 10.0
+# Requests are abandoned after this multiple of the p99 target
+TIMEOUT_FACTOR = 5
+
+
+def is_error(status):
+    """Transport failures and any 4xx/5xx (expired tokens included) count against the target"""
+    return status == 0 or status >= 400
+
+
+class LoadTester(ProductManagementTester):
+    """ProductManagementTester driving the lib/api.js endpoints, judged by response status"""
+
+    def __init__(self, session=None, request_timeout=DEFAULT_TIMEOUT):
+        super().__init__(session)
+        self.request_timeout = request_timeout
+        self.run_id = uuid.uuid4().hex[:8]
+        self.failures = 0
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.product_id = None
+        self.branch_id = None
+        self.owned = {'products': [], 'branches': []}
+
+    def log_result(self, test_name, success, message, details=None):
+        if not success:
+            self.failures += 1
+
+    def worker(self):
+        """Copy sharing auth and fixtures but with its own timed session"""
+        clone = copy.copy(self)
+        clone.session = RecordingSession(record_bodies=False)
+        clone.failures = 0
+        clone.iterations = 0
+        clone.failed_iterations = 0
+        return clone
+
+    def call(self, method, path, collection=None, **kwargs):
+        """Send one request and return its unwrapped payload
+
+        A 4xx/5xx status or a body that is not the expected JSON shape counts
+        as a failure; rows of list endpoints go through as_list so bare and
+        paginated responses are both accepted. Every request is bounded by
+        request_timeout so a stalled call is recorded (status 0) instead of
+        hanging its worker and dropping out of the window's p99.
+        """
+        kwargs.setdefault('timeout', self.request_timeout)
+        response = self.session.request(method, f"{self.base_url}{path}", headers=self.get_headers(),
+                                        **kwargs)
+        if is_error(response.status_code):
+            self.log_result(f"{method} {path}", False, f"HTTP {response.status_code}")
+            return None
+        try:
+            data = unwrap(response.json())
+        except ValueError:
+            self.log_result(f"{method} {path}", False, "Response is not JSON")
+            return None
+        if collection is None:
+            return data
+        if not isinstance(data, (list, dict)):
+            self.log_result(f"{method} {path}", False, f"Unexpected {collection} payload")
+            return None
+        return as_list(data, collection)
+
+    def setup_fixtures(self):
+        """Create a product and branch for the run, else borrow existing ones read-only"""
+        categories = self.call('GET', '/categories?limit=1', 'categories') or []
+        brands = self.call('GET', '/brands?limit=1', 'brands') or []
+        branch = self.call('POST', '/branches', json={
+            "code": f"LOAD-{self.run_id}",
+            "name": f"Load Test Branch {self.run_id}",
+            "address": "Adaptive load test",
+            "phone": "021-00000000"
+        })
+        if isinstance(branch, dict) and branch.get('id'):
+            self.branch_id = branch['id']
+            self.owned['branches'].append(self.branch_id)
+        if categories and brands:
+            product = self.call('POST', '/products', json={
+                "sku": f"LOAD-{self.run_id}",
+                "name": f"Load Test Product {self.run_id}",
+                "categoryId": categories[0]['id'],
+                "brandId": brands[0]['id'],
+                "unit": "PCS",
+                "purchasePrice": 10000,
+                "sellingPrice": 15000,
+                "minStock": 0,
+                "isActive": True
+            })
+            if isinstance(product, dict) and product.get('id'):
+                self.product_id = product['id']
+                self.owned['products'].append(self.product_id)
+
+        # Fall back to existing fixtures when the create endpoints are unavailable
+        if self.product_id is None:
+            products = self.call('GET', '/products?limit=1', 'products') or []
+            if products:
+                self.product_id = products[0]['id']
+                print(f"Borrowing existing product {self.product_id} - stock scenario will run read-only")
+        if self.branch_id is None:
+            branches = self.call('GET', '/branches?limit=1', 'branches') or []
+            if branches:
+                self.branch_id = branches[0]['id']
+        self.failures = 0
+        return bool(self.product_id and self.branch_id)
+
+    def cleanup_fixtures(self):
+        """Delete only the fixtures this run created, never borrowed ones"""
+        for collection in ['products', 'branches']:
+            for fixture_id in self.owned[collection]:
+                try:
+                    response = self.session.delete(f"{self.base_url}/{collection}/{fixture_id}",
+                                                   headers=self.get_headers(), timeout=self.request_timeout)
+                    if is_error(response.status_code):
+                        print(f"Could not delete {collection}/{fixture_id}: HTTP {response.status_code}")
+                except requests.RequestException as e:
+                    print(f"Could not delete {collection}/{fixture_id}: {e}")
+
+    def scenario_product(self):
+        self.call('GET', '/products?limit=20', 'products')
+        self.call('GET', f"/products/{self.product_id}")
+
+    def scenario_stock(self):
+        self.call('GET', '/stocks?limit=20', 'stocks')
+        self.call('GET', f"/stocks/product/{self.product_id}")
+        # Never change the real stock of a product borrowed from the backend;
+        # on our own product an IN/OUT pair leaves the level unchanged
+        if self.product_id in self.owned['products']:
+            for quantity, movement in [(1, "IN"), (-1, "OUT")]:
+                self.call('POST', f"/stocks/adjust/{self.product_id}",
+                          json={"branchId": self.branch_id, "quantity": quantity, "type": movement,
+                                "reason": "Adaptive load test", "notes": f"Load run {self.run_id}"})
+
+    def scenario_transaction(self):
+        self.call('GET', '/transactions/products/pos?limit=20', 'products')
+        self.call('GET', '/transactions?limit=20', 'transactions')
+
+
+class AdaptiveConcurrencyController:
+    """Concurrency limit driven by per-window p99 latency and error rate"""
+
+    def __init__(self, mode='aimd', target_p99_ms=800.0, target_error_rate=0.01,
+                 min_limit=1, max_limit=64, increase=1, decrease=0.5):
+        self.mode = mode
+        self.target_p99_ms = target_p99_ms
+        self.target_error_rate = target_error_rate
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = min_limit
+        self.min_latency = None
+
+    def healthy(self, window):
+        return (window['p99'] is not None and window['p99'] <= self.target_p99_ms
+                and window['error_rate'] <= self.target_error_rate)
+
+    def update(self, window):
+        """Return the next concurrency limit after observing window"""
+        if window['count'] == 0:
+            return self.limit
+
+        if self.mode == 'gradient':
+            # Gradient2-style: shrink in proportion to how far p50 has drifted
+            # from the best latency seen, plus headroom to keep probing
+            if self.min_latency is None or window['p50'] < self.min_latency:
+                self.min_latency = window['p50']
+            gradient = max(0.5, min(1.0, self.min_latency / window['p50']))
+            if self.healthy(window):
+                new_limit = self.limit * gradient + math.sqrt(self.limit)
+            else:
+                new_limit = self.limit * min(gradient, self.decrease)
+        elif self.healthy(window):
+            new_limit = self.limit + self.increase
+        else:
+            new_limit = self.limit * self.decrease
+
+        self.limit = max(self.min_limit, min(self.max_limit, int(new_limit)))
+        return self.limit
+
+
+class AdaptiveLoadRunner:
+    def __init__(self, tester, group, controller, window_seconds=5.0, windows=20):
+        self.tester = tester
+        self.group = group
+        self.controller = controller
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.scenario = getattr(LoadTester, f"scenario_{group}")
+        self.workers = [tester.worker() for _ in range(controller.max_limit)]
+        self.history = []
+
+    def _work(self, index, stop_event):
+        worker = self.workers[index]
+        while not stop_event.is_set():
+            if index >= self.controller.limit:
+                time.sleep(0.05)
+                continue
+            failures_before = worker.failures
+            try:
+                self.scenario(worker)
+                failed = worker.failures != failures_before
+            except Exception:
+                failed = True
+            with worker.session.lock:
+                worker.iterations += 1
+                worker.failed_iterations += failed
+
+    def _drain(self):
+        """Collect and reset every worker's recorded exchanges and iteration counts"""
+        exchanges = []
+        iterations = failed_iterations = 0
+        for worker in self.workers:
+            with worker.session.lock:
+                exchanges.extend(worker.session.exchanges)
+                worker.session.exchanges = []
+                iterations += worker.iterations
+                failed_iterations += worker.failed_iterations
+                worker.iterations = worker.failed_iterations = 0
+        return exchanges, iterations, failed_iterations
+
+    def run(self):
+        """Run the control loop for the configured number of windows"""
+        stop_event = threading.Event()
+        threads = [threading.Thread(target=self._work, args=(index, stop_event), daemon=True)
+                   for index in range(len(self.workers))]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for _ in range(self.windows):
+                limit = self.controller.limit
+                time.sleep(self.window_seconds)
+                exchanges, iterations, failed_iterations = self._drain()
+                latencies = [exchange['elapsed_ms'] for exchange in exchanges]
+                errors = sum(1 for exchange in exchanges if is_error(exchange['status']))
+                stats = summarize(latencies)
+                request_error_rate = errors / stats['count'] if stats['count'] else 0.0
+                check_failure_rate = failed_iterations / iterations if iterations else 0.0
+                window = {
+                    'limit': limit,
+                    'count': stats['count'],
+                    'throughput': stats['count'] / self.window_seconds,
+                    'p50': stats['p50'],
+                    'p99': stats['p99'],
+                    'request_error_rate': request_error_rate,
+                    'check_failure_rate': check_failure_rate,
+                    # A scenario whose checks fail is not healthy even if every response was 2xx
+                    'error_rate': max(request_error_rate, check_failure_rate),
+                }
+                window['healthy'] = self.controller.healthy(window)
+                window['next_limit'] = self.controller.update(window)
+                self.history.append(window)
+                print(f"  [{self.group}] limit {limit:>3} -> {window['next_limit']:>3}  "
+                      f"{window['throughput']:>7.1f} req/s  p99 {format_ms(window['p99']):>8} ms  "
+                      f"errors {window['request_error_rate'] * 100:>5.1f}%  "
+                      f"failed checks {window['check_failure_rate'] * 100:>5.1f}%")
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+        return self.history
+
+    def knee(self):
+        """Highest-throughput window that stayed within the targets"""
+        healthy = [window for window in self.history if window['healthy']]
+        if not healthy:
+            return None
+        return max(healthy, key=lambda window: window['throughput'])
+
+
+def prepare_tester(tester):
+    """Authenticate and make sure a product and branch exist to drive scenarios"""
+    if not tester.authenticate():
+        return False
+    try:
+        return tester.setup_fixtures()
+    except requests.RequestException as e:
+        print(f"Fixture setup error: {e}")
+        return False
+
+
+def print_report(runners, cashier_rps):
+    print("\n" + "=" * 80)
+    print("SUSTAINABLE THROUGHPUT (KNEE OF THROUGHPUT/LATENCY CURVE)")
+    print("=" * 80)
+    print(f"  {'group':<14} {'concurrency':>12} {'req/s':>9} {'p99 ms':>9} {'errors':>8} {'cashiers':>9}")
+    for runner in runners:
+        knee = runner.knee()
+        if knee is None:
+            print(f"  {runner.group:<14} no window met the targets")
+            continue
+        cashiers = int(knee['throughput'] / cashier_rps) if cashier_rps else '-'
+        print(f"  {runner.group:<14} {knee['limit']:>12} {knee['throughput']:>9.1f} "
+              f"{format_ms(knee['p99']):>9} {knee['error_rate'] * 100:>7.1f}% {cashiers:>9}")
+    print(f"\nCashiers assume {cashier_rps:g} req/s per active cashier for that endpoint group")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive concurrency load test")
+    parser.add_argument("--groups", default=','.join(GROUPS),
+                        help=f"comma separated endpoint groups ({', '.join(GROUPS)})")
+    parser.add_argument("--mode", choices=['aimd', 'gradient'], default='aimd')
+    parser.add_argument("--target-p99", type=float, default=800.0, help="p99 latency target in ms")
+    parser.add_argument("--timeout", type=float,
+                        help=f"per-request timeout in seconds (default: {TIMEOUT_FACTOR}x the p99 target)")
+    parser.add_argument("--target-errors", type=float, default=0.01, help="error rate target (0-1)")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--window", type=float, default=5.0, help="seconds per control window")
+    parser.add_argument("--windows", type=int, default=20, help="control windows per group")
+    parser.add_argument("--cashier-rps", type=float, default=0.5,
+                        help="requests per second a single busy cashier generates")
+    parser.add_argument("--base-url", help="override the API base URL")
+    args = parser.parse_args()
+
+    tester = LoadTester(request_timeout=args.timeout or args.target_p99 * TIMEOUT_FACTOR / 1000)
+    if args.base_url:
+        tester.base_url = args.base_url
+
+    print("=" * 80)
+    print(f"ADAPTIVE CONCURRENCY LOAD TEST ({args.mode.upper()})")
+    print("=" * 80)
+    if not prepare_tester(tester):
+        print("❌ Authentication or fixture setup failed. Cannot run load test.")
+        raise SystemExit(1)
+
+    runners = []
+    try:
+        for group in [group.strip() for group in args.groups.split(',')]:
+            if group not in GROUPS:
+                print(f"Unknown group: {group}")
+                continue
+            controller = AdaptiveConcurrencyController(args.mode, args.target_p99, args.target_errors,
+                                                       max_limit=args.max_concurrency)
+            runner = AdaptiveLoadRunner(tester, group, controller, args.window, args.windows)
+            print(f"\n--- {group} ---")
+            runner.run()
+            runners.append(runner)
+    finally:
+        tester.cleanup_fixtures()
+
+    print_report(runners, args.cashier_rps)
@@ -3,6 +3,7 @@
 Comprehensive Backend Testing for Product Management Module
 Tests all product endpoints including CRUD operations, margin analysis, 
 promotional pricing, volume discounts, and stock management.
+The same checks run as an isolated, shardable pytest suite under tests/.
 """
 
 import requests
@@ -16,8 +17,9 @@ AUTH_USERNAME = "admin"
 AUTH_PASSWORD = "admin123"
 
 class ProductManagementTester:
-    def __init__(self):
+    def __init__(self, session=None):
         self.base_url = BASE_URL
+        self.session = session or requests.Session()
         self.token = None
         self.test_results = []
         self.created_products = []
@@ -44,7 +46,7 @@ class ProductManagementTester:
         """Authenticate and get JWT token"""
         try:
             # First initialize the system
-            init_response = requests.get(f"{self.base_url}/init")
+            init_response = self.session.get(f"{self.base_url}/init")
             print(f"System initialization: {init_response.status_code}")
             
             # Login to get token
@@ -53,11 +55,11 @@ class ProductManagementTester:
                 "password": AUTH_PASSWORD
             }
             
-            response = requests.post(f"{self.base_url}/auth/login", json=login_data)
+            response = self.session.post(f"{self.base_url}/auth/login", json=login_data)
             
             if response.status_code == 200:
                 data = response.json()
-                self.token = data.get('token')
+                self.token = data.get('token') or data.get('accessToken')
                 self.log_result("Authentication", True, "Successfully authenticated", 
                               f"Token received for user: {data.get('user', {}).get('username')}")
                 return True
@@ -77,18 +79,18 @@ class ProductManagementTester:
             'Content-Type': 'application/json'
         }
     
-    def setup_test_data(self):
+    def setup_test_data(self, suffix=""):
         """Create test categories, brands, and branches for product testing"""
         try:
             # Create test category
             category_data = {
-                "name": "Motorcycle Parts",
+                "name": f"Motorcycle Parts{suffix}",
                 "description": "Test category for motorcycle parts",
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/categories/create", 
-                                   json=category_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/categories/create", 
+                                       json=category_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 category = response.json()
@@ -102,13 +104,13 @@ class ProductManagementTester:
             
             # Create test brand
             brand_data = {
-                "name": "Honda",
+                "name": f"Honda{suffix}",
                 "description": "Test brand for Honda parts",
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/brands/create", 
-                                   json=brand_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/brands/create", 
+                                       json=brand_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 brand = response.json()
@@ -122,15 +124,15 @@ class ProductManagementTester:
             
             # Create test branch
             branch_data = {
-                "name": "Main Branch",
-                "code": "MB001",
+                "name": f"Main Branch{suffix}",
+                "code": f"MB001{suffix}",
                 "address": "123 Main Street",
                 "phone": "555-0123",
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/branches/create", 
-                                   json=branch_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/branches/create", 
+                                       json=branch_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 branch = response.json()
@@ -173,8 +175,8 @@ class ProductManagementTester:
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/products/create", 
-                                   json=product_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/create", 
+                                       json=product_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 product = response.json()
@@ -199,8 +201,8 @@ class ProductManagementTester:
                 return False
             
             # Test 2: Read Product
-            response = requests.get(f"{self.base_url}/products/{product['id']}", 
-                                  headers=self.get_headers())
+            response = self.session.get(f"{self.base_url}/products/{product['id']}", 
+                                      headers=self.get_headers())
             
             if response.status_code == 200:
                 retrieved_product = response.json()
@@ -236,8 +238,8 @@ class ProductManagementTester:
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/products/{product['id']}/update", 
-                                   json=update_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/{product['id']}/update", 
+                                       json=update_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 updated_product = response.json()
@@ -253,8 +255,8 @@ class ProductManagementTester:
                               f"Failed to update product: {response.status_code}")
             
             # Test 4: Toggle Product Active Status
-            response = requests.post(f"{self.base_url}/products/{product['id']}/toggle", 
-                                   headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/{product['id']}/toggle", 
+                                       headers=self.get_headers())
             
             if response.status_code == 200:
                 toggled_product = response.json()
@@ -294,8 +296,8 @@ class ProductManagementTester:
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/products/create", 
-                                   json=product_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/create", 
+                                       json=product_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 product = response.json()
@@ -342,8 +344,8 @@ class ProductManagementTester:
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/products/create", 
-                                   json=product_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/create", 
+                                       json=product_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 product = response.json()
@@ -377,8 +379,8 @@ class ProductManagementTester:
         """Test Margin Analysis (FR-PRD-011)"""
         try:
             # Test margin report endpoint
-            response = requests.get(f"{self.base_url}/products/margin-report", 
-                                  headers=self.get_headers())
+            response = self.session.get(f"{self.base_url}/products/margin-report", 
+                                      headers=self.get_headers())
             
             if response.status_code == 200:
                 margin_data = response.json()
@@ -455,8 +457,8 @@ class ProductManagementTester:
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/products/{product_id}/promo", 
-                                   json=promo_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/{product_id}/promo", 
+                                       json=promo_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 updated_product = response.json()
@@ -505,8 +507,8 @@ class ProductManagementTester:
                 "is_active": True
             }
             
-            response = requests.post(f"{self.base_url}/products/{product_id}/volume-discount", 
-                                   json=discount_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/{product_id}/volume-discount", 
+                                       json=discount_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 updated_product = response.json()
@@ -555,8 +557,8 @@ class ProductManagementTester:
                 "stock_quantity": 50
             }
             
-            response = requests.post(f"{self.base_url}/products/{product_id}/stock", 
-                                   json=stock_data, headers=self.get_headers())
+            response = self.session.post(f"{self.base_url}/products/{product_id}/stock", 
+                                       json=stock_data, headers=self.get_headers())
             
             if response.status_code == 200:
                 updated_product = response.json()
@@ -586,7 +588,7 @@ class ProductManagementTester:
         """Test Product Search and Filtering"""
         try:
             # Test 1: Get all products
-            response = requests.get(f"{self.base_url}/products", headers=self.get_headers())
+            response = self.session.get(f"{self.base_url}/products", headers=self.get_headers())
             
             if response.status_code == 200:
                 all_products = response.json()
@@ -604,8 +606,8 @@ class ProductManagementTester:
             
             # Test 2: Filter by category
             if self.created_categories:
-                response = requests.get(f"{self.base_url}/products?category_id={self.created_categories[0]}", 
-                                      headers=self.get_headers())
+                response = self.session.get(f"{self.base_url}/products?category_id={self.created_categories[0]}", 
+                                          headers=self.get_headers())
                 
                 if response.status_code == 200:
                     filtered_products = response.json()
@@ -617,8 +619,8 @@ class ProductManagementTester:
                                   f"Category filtering failed: {response.status_code}")
             
             # Test 3: Search by name
-            response = requests.get(f"{self.base_url}/products?search=Honda", 
-                                  headers=self.get_headers())
+            response = self.session.get(f"{self.base_url}/products?search=Honda", 
+                                      headers=self.get_headers())
             
             if response.status_code == 200:
                 search_results = response.json()
@@ -641,8 +643,8 @@ class ProductManagementTester:
             # Delete created products
             for product_id in self.created_products:
                 try:
-                    response = requests.post(f"{self.base_url}/products/{product_id}/delete", 
-                                           headers=self.get_headers())
+                    response = self.session.post(f"{self.base_url}/products/{product_id}/delete", 
+                                               headers=self.get_headers())
                     if response.status_code == 200:
                         print(f"Deleted product: {product_id}")
                 except:
@@ -651,8 +653,8 @@ class ProductManagementTester:
             # Delete created categories
             for category_id in self.created_categories:
                 try:
-                    response = requests.post(f"{self.base_url}/categories/{category_id}/delete", 
-                                           headers=self.get_headers())
+                    response = self.session.post(f"{self.base_url}/categories/{category_id}/delete", 
+                                               headers=self.get_headers())
                     if response.status_code == 200:
                         print(f"Deleted category: {category_id}")
                 except:
@@ -661,8 +663,8 @@ class ProductManagementTester:
             # Delete created brands
             for brand_id in self.created_brands:
                 try:
-                    response = requests.post(f"{self.base_url}/brands/{brand_id}/delete", 
-                                           headers=self.get_headers())
+                    response = self.session.post(f"{self.base_url}/brands/{brand_id}/delete", 
+                                               headers=self.get_headers())
                     if response.status_code == 200:
                         print(f"Deleted brand: {brand_id}")
                 except:
@@ -671,8 +673,8 @@ class ProductManagementTester:
             # Delete created branches
             for branch_id in self.created_branches:
                 try:
-                    response = requests.post(f"{self.base_url}/branches/{branch_id}/delete", 
-                                           headers=self.get_headers())
+                    response = self.session.post(f"{self.base_url}/branches/{branch_id}/delete", 
+                                               headers=self.get_headers())
                     if response.status_code == 200:
                         print(f"Deleted branch: {branch_id}")
                 except:
@@ -750,5 +752,17 @@ class ProductManagementTester:
                 print(f"  - {result['test']}: {result['message']}")
 
 if __name__ == "__main__":
-    tester = ProductManagementTester()
-    tester.run_all_tests()
\ No newline at end of file
+    import argparse
+    from traffic_replay import RecordingSession
+
+    parser = argparse.ArgumentParser(description="Product management backend tests")
+    parser.add_argument("--record", metavar="CASSETTE",
+                        help="record request/response exchanges to a cassette file")
+    args = parser.parse_args()
+
+    session = RecordingSession(BASE_URL) if args.record else None
+    tester = ProductManagementTester(session)
+    tester.run_all_tests()
+    if session is not None:
+        session.save(args.record)
+        print(f"Recorded {len(session.exchanges)} exchanges to {args.record}")
\ No newline at end of file
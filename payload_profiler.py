@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Payload Size and Compression Profiler
+Samples every GET endpoint used by backend_test.py and lib/api.js, reports raw,
+gzip and brotli response sizes, breaks each payload down by field, and projects
+the savings from sparse field selection and compression.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+
+import requests
+
+from backend_test import ProductManagementTester
+from perf_utils import as_list, timed_call, unwrap
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+API_JS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib', 'api.js')
+
+# GET endpoints exercised by ProductManagementTester
+TESTER_ENDPOINTS = [
+    '/products',
+    '/products?search=Honda',
+    '/products/margin-report',
+    '/products/${id}',
+]
+
+# Where to find a sample value for a path placeholder: (collection, field)
+PLACEHOLDER_SOURCES = {
+    'productId': ('/products', 'id'),
+    'invoiceNo': ('/transactions', 'invoiceNo'),
+}
+
+# Siblings that mark a dict as a paginated collection envelope
+PAGINATION_KEYS = ('pagination', 'meta', 'total', 'totalPages')
+
+GET_CALL_PATTERN = re.compile(r"""\bapi\.get\(\s*['`]([^'`]+)['`]""")
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+
+def discover_endpoints(api_js_path=API_JS_PATH):
+    """Return the unique GET paths used by lib/api.js and the tester"""
+    endpoints = []
+    try:
+        with open(api_js_path, encoding='utf-8') as f:
+            endpoints.extend(GET_CALL_PATTERN.findall(f.read()))
+    except OSError as e:
+        print(f"Could not read {api_js_path}: {e}")
+    endpoints.extend(TESTER_ENDPOINTS)
+
+    seen = []
+    for endpoint in endpoints:
+        if endpoint not in seen:
+            seen.append(endpoint)
+    return seen
+
+
+def collection_key(endpoint):
+    """Return the key a collection endpoint nests its rows under, e.g. /products -> products"""
+    segments = [segment for segment in endpoint.split('?')[0].split('/') if segment]
+    if not segments or PLACEHOLDER_PATTERN.search(segments[-1]):
+        return None
+    return segments[-1]
+
+
+def extract_rows(payload, key=None):
+    """Find the row objects in a payload; a single object counts as one row
+
+    A dict only counts as a collection when it carries a pagination sibling and
+    a non-empty list of objects under key, 'items' or 'data'. Otherwise list
+    fields such as tags or volume_discounts would be mistaken for the rows.
+    """
+    data = unwrap(payload)
+    if isinstance(data, list):
+        return [row for row in data if isinstance(row, dict)]
+    if isinstance(data, dict):
+        if any(name in data for name in PAGINATION_KEYS):
+            for name in (key, 'items', 'data'):
+                value = data.get(name) if name else None
+                if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+                    return value
+        return [data]
+    return []
+
+
+def compressed_sizes(body):
+    """Return (gzip, brotli) sizes for body; brotli is None if unavailable"""
+    gzip_size = len(gzip.compress(body, compresslevel=6))
+    brotli_size = len(brotli.compress(body, quality=5)) if brotli else None
+    return gzip_size, brotli_size
+
+
+def encode(data):
+    """Serialize the way a compact JSON API would"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def field_breakdown(rows):
+    """Return {field: bytes} summed across rows, including the key itself"""
+    totals = {}
+    for row in rows:
+        for key, value in row.items():
+            totals[key] = totals.get(key, 0) + len(encode(key)) + 1 + len(encode(value)) + 1
+    return totals
+
+
+def sparse_projection(rows, fields=None):
+    """Project rows to fields, or to their scalar fields when none are given"""
+    projected = []
+    for row in rows:
+        if fields:
+            projected.append({key: row[key] for key in fields if key in row})
+        else:
+            projected.append({key: value for key, value in row.items()
+                              if not isinstance(value, (dict, list))})
+    return projected
+
+
+class PayloadProfiler:
+    def __init__(self, tester=None, endpoints=None, sparse_fields=None, top_fields=8):
+        self.tester = tester or ProductManagementTester()
+        self.base_url = self.tester.base_url
+        self.endpoints = endpoints or discover_endpoints()
+        self.sparse_fields = sparse_fields
+        self.top_fields = top_fields
+        self.samples = {}
+        self.results = []
+        self.skipped = []
+
+    def fetch(self, path):
+        """GET path uncompressed so raw bytes can be measured locally"""
+        headers = dict(self.tester.get_headers())
+        headers['Accept-Encoding'] = 'identity'
+        return timed_call(requests.get, f"{self.base_url}{path}", headers=headers)
+
+    def _sample_value(self, collection, field):
+        """Return field from the first row of collection, cached per collection"""
+        if collection not in self.samples:
+            response, _, error = self.fetch(f"{collection}?limit=1")
+            rows = []
+            if error is None and response.status_code == 200:
+                try:
+                    rows = as_list(unwrap(response.json()), collection_key(collection))
+                except ValueError:
+                    rows = []
+            self.samples[collection] = rows[0] if rows else {}
+        return self.samples[collection].get(field)
+
+    def resolve(self, endpoint):
+        """Fill ${...} placeholders with sample values, or return None"""
+        path = endpoint
+        for name in PLACEHOLDER_PATTERN.findall(endpoint):
+            if name in PLACEHOLDER_SOURCES:
+                collection, field = PLACEHOLDER_SOURCES[name]
+            else:
+                collection, field = endpoint.split('/${')[0], 'id'
+            value = self._sample_value(collection, field)
+            if value is None:
+                return None
+            path = path.replace('${' + name + '}', str(value))
+        return path
+
+    def profile_endpoint(self, endpoint):
+        path = self.resolve(endpoint)
+        if path is None:
+            self.skipped.append((endpoint, "no sample value for placeholder"))
+            return
+        response, elapsed, error = self.fetch(path)
+        if error is not None:
+            self.skipped.append((endpoint, str(error)))
+            return
+        if response.status_code != 200:
+            self.skipped.append((endpoint, f"HTTP {response.status_code}"))
+            return
+
+        body = response.content
+        gzip_size, brotli_size = compressed_sizes(body)
+        result = {
+            'endpoint': endpoint,
+            'path': path,
+            'latency_ms': elapsed,
+            'raw': len(body),
+            'gzip': gzip_size,
+            'brotli': brotli_size,
+            'fields': {},
+            'rows': 0,
+            'sparse': None,
+        }
+
+        try:
+            rows = extract_rows(response.json(), collection_key(endpoint))
+        except ValueError:
+            rows = []
+        if rows:
+            result['rows'] = len(rows)
+            result['fields'] = field_breakdown(rows)
+            # Compare against the rows re-encoded the same way, so the saving
+            # reflects dropped fields rather than envelope or formatting
+            rows_body = encode(rows)
+            rows_gzip, rows_brotli = compressed_sizes(rows_body)
+            result['rows_encoded'] = {'raw': len(rows_body), 'gzip': rows_gzip, 'brotli': rows_brotli}
+            sparse_body = encode(sparse_projection(rows, self.sparse_fields))
+            sparse_gzip, sparse_brotli = compressed_sizes(sparse_body)
+            result['sparse'] = {'raw': len(sparse_body), 'gzip': sparse_gzip, 'brotli': sparse_brotli}
+        self.results.append(result)
+
+    def run(self):
+        """Profile every endpoint and print the report"""
+        print("=" * 80)
+        print("PAYLOAD SIZE AND COMPRESSION PROFILE")
+        print("=" * 80)
+
+        if not self.tester.authenticate():
+            print("❌ Authentication failed. Cannot profile endpoints.")
+            return False
+        if brotli is None:
+            print("brotli module not installed - brotli sizes will be skipped (pip install brotli)")
+
+        for endpoint in self.endpoints:
+            self.profile_endpoint(endpoint)
+
+        self.print_report()
+        return True
+
+    def print_report(self):
+        """Print per-endpoint sizes, field breakdowns and projected savings"""
+        self.results.sort(key=lambda result: result['raw'], reverse=True)
+
+        print(f"\n  {'endpoint':<44} {'raw':>10} {'gzip':>10} {'brotli':>10} {'ms':>8}")
+        for result in self.results:
+            print(f"  {result['endpoint']:<44} {_kb(result['raw']):>10} {_kb(result['gzip']):>10} "
+                  f"{_kb(result['brotli']):>10} {result['latency_ms']:>8.1f}")
+
+        for result in self.results:
+            if not result['fields']:
+                continue
+            print(f"\n--- {result['endpoint']} ({result['rows']} rows, {_kb(result['raw'])}) ---")
+            baseline = result['rows_encoded']
+            ranked = sorted(result['fields'].items(), key=lambda item: item[1], reverse=True)
+            for field, size in ranked[:self.top_fields]:
+                print(f"  {field:<28} {_kb(size):>10} {size / baseline['raw'] * 100:>6.1f}%")
+
+            sparse = result['sparse']
+            print(f"  Rows as compact JSON: {_kb(baseline['raw'])} raw, {_kb(baseline['gzip'])} gzip")
+            print(f"  Sparse fields: {_kb(sparse['raw'])} raw "
+                  f"({_saving(baseline['raw'], sparse['raw'])} saved), "
+                  f"{_kb(sparse['gzip'])} gzip ({_saving(baseline['gzip'], sparse['gzip'])} saved)")
+            print(f"  Compression only: gzip saves {_saving(result['raw'], result['gzip'])}"
+                  + (f", brotli saves {_saving(result['raw'], result['brotli'])}"
+                     if result['brotli'] is not None else ""))
+
+        total_raw = sum(result['raw'] for result in self.results)
+        total_gzip = sum(result['gzip'] for result in self.results)
+        print("\n" + "=" * 80)
+        print(f"Endpoints profiled: {len(self.results)}, skipped: {len(self.skipped)}")
+        print(f"Total: {_kb(total_raw)} raw, {_kb(total_gzip)} gzip "
+              f"({_saving(total_raw, total_gzip)} saved)")
+        if self.skipped:
+            print("\nSKIPPED:")
+            for endpoint, reason in self.skipped:
+                print(f"  - {endpoint}: {reason}")
+
+
+def _kb(size):
+    return "-" if size is None else f"{size / 1024:.1f} KB"
+
+
+def _saving(before, after):
+    if not before or after is None:
+        return "-"
+    return f"{(1 - after / before) * 100:.1f}%"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Payload size and compression profiler")
+    parser.add_argument("--fields", help="comma separated fields for the sparse projection "
+                                         "(default: scalar fields only)")
+    parser.add_argument("--top", type=int, default=8, help="fields to show per endpoint")
+    parser.add_argument("--base-url", help="override the API base URL")
+    args = parser.parse_args()
+
+    tester = ProductManagementTester()
+    if args.base_url:
+        tester.base_url = args.base_url
+    fields = [field.strip() for field in args.fields.split(',')] if args.fields else None
+    PayloadProfiler(tester, sparse_fields=fields, top_fields=args.top).run()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the backend performance scripts.
+Latency bookkeeping, percentile summaries and response unwrapping used by
+the scenario drivers that sit next to backend_test.py.
+"""
+
+import time
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) using linear interpolation"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * weight
+
+
+def summarize(values):
+    """Summarize a list of latencies (ms) into count/mean/p50/p95/p99/max"""
+    if not values:
+        return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values)
+    }
+
+
+def timed_call(func, *args, **kwargs):
+    """Call func and return (result, elapsed_ms, error)"""
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        return result, (time.perf_counter() - start) * 1000, None
+    except Exception as e:
+        return None, (time.perf_counter() - start) * 1000, e
+
+
+def unwrap(payload):
+    """Strip the {success, data} envelope the API wraps most responses in"""
+    if isinstance(payload, dict) and 'data' in payload and (
+            'success' in payload or 'message' in payload):
+        return payload['data']
+    return payload
+
+
+def as_list(data, key):
+    """Accept either a bare list or a paginated {key: [...]} payload"""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get(key) or data.get('items') or []
+    return []
+
+
+def format_ms(value):
+    """Format a millisecond value for report tables"""
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_latency_table(title, rows):
+    """Print {label: latencies} as a percentile table"""
+    print(f"\n{title}")
+    print(f"  {'name':<32} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for label, values in rows.items():
+        stats = summarize(values)
+        print(f"  {label:<32} {stats['count']:>6} {format_ms(stats['mean']):>9} "
+              f"{format_ms(stats['p50']):>9} {format_ms(stats['p95']):>9} "
+              f"{format_ms(stats['p99']):>9} {format_ms(stats['max']):>9}")
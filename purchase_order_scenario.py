@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Purchase Order Lifecycle Throughput Scenario
+Drives many purchase orders concurrently through create -> submit -> approve ->
+receive, measures per-transition latency, the delay until received stock is
+visible on /stocks/product/{id}, and the impact on concurrent POS reads.
+All orders go against a supplier, branch and products created for the run;
+received stock is reversed and the fixtures deleted afterwards.
+"""
+
+import argparse
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import requests
+
+from backend_test import ProductManagementTester
+from perf_utils import as_list, format_ms, print_latency_table, summarize, timed_call, unwrap
+
+TRANSITIONS = ['create', 'submit', 'approve', 'receive']
+
+
+class PurchaseOrderScenarioDriver:
+    def __init__(self, tester=None, po_count=20, concurrency=5, pos_readers=2,
+                 quantity=5, visibility_timeout=30.0, poll_interval=0.25):
+        self.tester = tester or ProductManagementTester()
+        self.base_url = self.tester.base_url
+        self.po_count = po_count
+        self.concurrency = concurrency
+        self.pos_readers = pos_readers
+        self.quantity = quantity
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+
+        self.run_id = uuid.uuid4().hex[:8]
+        self.supplier_id = None
+        self.branch_id = None
+        self.product_pool = queue.Queue()
+        self.created = {'suppliers': [], 'branches': [], 'products': [], 'purchase-orders': []}
+        self.received = {}
+
+        self.lock = threading.Lock()
+        self.receiving_in_flight = 0
+        self.polling_in_flight = 0
+        self.receive_seq = 0
+        self.poll_seq = 0
+        self.transition_latencies = {name: [] for name in TRANSITIONS}
+        self.visibility_latencies = []
+        self.pos_reads = []
+        self.failures = []
+        self.completed = 0
+        self.wall_time = 0.0
+
+    def _create(self, collection, data):
+        """POST a fixture and remember it for cleanup, returning its id"""
+        response = requests.post(f"{self.base_url}/{collection}", json=data,
+                                 headers=self.tester.get_headers())
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"Failed to create {collection}: {response.status_code} {response.text}")
+        fixture_id = unwrap(response.json())['id']
+        self.created[collection].append(fixture_id)
+        return fixture_id
+
+    def setup_fixtures(self):
+        """Create a dedicated supplier, branch and product pool for this run
+
+        Receives only ever touch these fixtures, and each product is checked
+        out by one in-flight PO at a time so stock visibility is unambiguous.
+        """
+        headers = self.tester.get_headers()
+        try:
+            categories = as_list(unwrap(requests.get(f"{self.base_url}/categories?limit=1",
+                                                     headers=headers).json()), 'categories')
+            brands = as_list(unwrap(requests.get(f"{self.base_url}/brands?limit=1",
+                                                 headers=headers).json()), 'brands')
+            if not (categories and brands):
+                raise RuntimeError("Need at least one category and brand to create products")
+
+            self.supplier_id = self._create('suppliers', {
+                "name": f"Scenario Supplier {self.run_id}",
+                "contactPerson": "Throughput Scenario",
+                "phone": "021-00000000",
+                "paymentTerms": "Net 30",
+                "isActive": True
+            })
+            self.branch_id = self._create('branches', {
+                "code": f"PO-{self.run_id}",
+                "name": f"Scenario Branch {self.run_id}",
+                "address": "Throughput scenario",
+                "phone": "021-00000000"
+            })
+            for index in range(self.concurrency):
+                self.product_pool.put(self._create('products', {
+                    "sku": f"POS-{self.run_id}-{index}",
+                    "name": f"Scenario Product {self.run_id} #{index}",
+                    "categoryId": categories[0]['id'],
+                    "brandId": brands[0]['id'],
+                    "unit": "PCS",
+                    "purchasePrice": 10000,
+                    "sellingPrice": 15000,
+                    "minStock": 0,
+                    "isActive": True
+                }))
+        except Exception as e:
+            self.tester.log_result("PO Scenario - Fixtures", False, f"Fixture setup error: {str(e)}")
+            return False
+
+        self.tester.log_result("PO Scenario - Fixtures", True,
+                               f"Created {self.concurrency} products for run {self.run_id}",
+                               f"Supplier: {self.supplier_id}, Branch: {self.branch_id}")
+        return True
+
+    def cleanup_fixtures(self):
+        """Reverse received stock, then delete everything this run created"""
+        headers = self.tester.get_headers()
+        leftovers = []
+        for product_id, quantity in self.received.items():
+            adjust_data = {
+                "branchId": self.branch_id,
+                "quantity": -quantity,
+                "type": "OUT",
+                "reason": "Reverse throughput scenario receive",
+                "notes": f"PO scenario {self.run_id}"
+            }
+            try:
+                response = requests.post(f"{self.base_url}/stocks/adjust/{product_id}",
+                                         json=adjust_data, headers=headers)
+                if response.status_code not in (200, 201):
+                    leftovers.append(f"stock {product_id}: HTTP {response.status_code}")
+            except requests.RequestException as e:
+                leftovers.append(f"stock {product_id}: {e}")
+
+        for collection in ['purchase-orders', 'products', 'branches', 'suppliers']:
+            for fixture_id in self.created[collection]:
+                try:
+                    response = requests.delete(f"{self.base_url}/{collection}/{fixture_id}",
+                                               headers=headers)
+                    if response.status_code not in (200, 204):
+                        leftovers.append(f"{collection}/{fixture_id}: HTTP {response.status_code}")
+                except requests.RequestException as e:
+                    leftovers.append(f"{collection}/{fixture_id}: {e}")
+
+        if leftovers:
+            self.tester.log_result("PO Scenario - Cleanup", False,
+                                   f"{len(leftovers)} cleanup steps failed", "; ".join(leftovers[:10]))
+        else:
+            self.tester.log_result("PO Scenario - Cleanup", True,
+                                   "Received stock reversed and fixtures deleted")
+
+    def _record_failure(self, index, transition, message):
+        with self.lock:
+            self.failures.append({'po': index, 'transition': transition, 'message': message})
+
+    def _transition(self, index, name, method, url, payload=None):
+        """Run one lifecycle transition, returning the unwrapped body or None"""
+        response, elapsed, error = timed_call(method, url, json=payload,
+                                              headers=self.tester.get_headers())
+        if error is not None:
+            self._record_failure(index, name, str(error))
+            return None
+        if response.status_code not in (200, 201):
+            self._record_failure(index, name, f"HTTP {response.status_code}")
+            return None
+        with self.lock:
+            self.transition_latencies[name].append(elapsed)
+        return unwrap(response.json())
+
+    def stock_level(self, product_id):
+        """Return the stock for product_id at the scenario branch, or None if unreadable"""
+        try:
+            response = requests.get(f"{self.base_url}/stocks/product/{product_id}",
+                                    headers=self.tester.get_headers())
+            if response.status_code != 200:
+                return None
+            stock = unwrap(response.json())
+        except (requests.RequestException, ValueError):
+            return None
+        for branch_stock in stock.get('stocksByBranch') or []:
+            branch_id = branch_stock.get('branchId') or (branch_stock.get('branch') or {}).get('id')
+            if branch_id == self.branch_id:
+                return int(branch_stock.get('quantity') or 0)
+        return int(stock.get('totalStock') or 0)
+
+    def _wait_for_stock(self, product_id, expected, received_at):
+        """Poll the stock endpoint until expected units are visible"""
+        deadline = received_at + self.visibility_timeout
+        while time.perf_counter() < deadline:
+            level = self.stock_level(product_id)
+            if level is not None and level >= expected:
+                return (time.perf_counter() - received_at) * 1000
+            time.sleep(self.poll_interval)
+        return None
+
+    def run_lifecycle(self, index):
+        """Push one purchase order through the full lifecycle"""
+        product_id = self.product_pool.get()
+        try:
+            return self._run_lifecycle(index, product_id)
+        finally:
+            self.product_pool.put(product_id)
+
+    def _run_lifecycle(self, index, product_id):
+        po_data = {
+            "supplierId": self.supplier_id,
+            "branchId": self.branch_id,
+            "expectedDate": (datetime.now() + timedelta(days=3)).isoformat(),
+            "paymentTerms": "Net 30",
+            "notes": f"Throughput scenario PO #{index}",
+            "items": [
+                {"productId": product_id, "orderedQty": self.quantity, "unitPrice": 10000}
+            ]
+        }
+
+        po = self._transition(index, 'create', requests.post,
+                              f"{self.base_url}/purchase-orders", po_data)
+        if not po:
+            return False
+        po_id = po['id']
+        with self.lock:
+            self.created['purchase-orders'].append(po_id)
+
+        if self._transition(index, 'submit', requests.patch,
+                            f"{self.base_url}/purchase-orders/{po_id}/submit") is None:
+            return False
+        if self._transition(index, 'approve', requests.patch,
+                            f"{self.base_url}/purchase-orders/{po_id}/approve",
+                            {"notes": "Approved by throughput scenario"}) is None:
+            return False
+
+        # This PO holds product_id exclusively, so the level only moves by its own receive
+        before = self.stock_level(product_id)
+        receive_data = {
+            "items": [
+                {"itemId": item['id'], "receivedQty": item.get('orderedQty', self.quantity)}
+                for item in po.get('items', [])
+            ],
+            "receivedDate": datetime.now().isoformat(),
+            "notes": "Received by throughput scenario"
+        }
+
+        with self.lock:
+            self.receiving_in_flight += 1
+            self.receive_seq += 1
+        try:
+            received = self._transition(index, 'receive', requests.patch,
+                                        f"{self.base_url}/purchase-orders/{po_id}/receive",
+                                        receive_data)
+        finally:
+            with self.lock:
+                self.receiving_in_flight -= 1
+        if received is None:
+            return False
+        received_at = time.perf_counter()
+        with self.lock:
+            self.received[product_id] = self.received.get(product_id, 0) + self.quantity
+        # Pooled products carry stock from earlier POs, so without a baseline
+        # the level would already look visible and bias the sample towards zero
+        if before is None:
+            self._record_failure(index, 'visibility',
+                                 "Stock level unreadable before receive; visibility not sampled")
+            return False
+
+        with self.lock:
+            self.polling_in_flight += 1
+            self.poll_seq += 1
+        try:
+            visible_after = self._wait_for_stock(product_id, before + self.quantity, received_at)
+        finally:
+            with self.lock:
+                self.polling_in_flight -= 1
+
+        if visible_after is None:
+            self._record_failure(index, 'visibility',
+                                 f"Stock not visible within {self.visibility_timeout}s")
+            return False
+
+        with self.lock:
+            self.visibility_latencies.append(visible_after)
+            self.completed += 1
+        return True
+
+    def _pos_reader(self, stop_event):
+        """Continuously read the POS product list, tagging each read by what it overlapped
+
+        A read overlaps a receive (or visibility polling) if one was in flight
+        when it started or one began before it finished.
+        """
+        while not stop_event.is_set():
+            with self.lock:
+                receiving = self.receiving_in_flight > 0
+                polling = self.polling_in_flight > 0
+                receive_seq, poll_seq = self.receive_seq, self.poll_seq
+            response, elapsed, error = timed_call(
+                requests.get, f"{self.base_url}/transactions/products/pos?limit=20",
+                headers=self.tester.get_headers())
+            with self.lock:
+                receiving = receiving or self.receive_seq != receive_seq
+                polling = polling or self.poll_seq != poll_seq
+                phase = 'receive' if receiving else 'polling' if polling else 'idle'
+                ok = error is None and response.status_code == 200
+                self.pos_reads.append({'latency': elapsed, 'phase': phase, 'ok': ok})
+
+    def run(self):
+        """Run the scenario end to end"""
+        print("=" * 80)
+        print("PURCHASE ORDER LIFECYCLE - THROUGHPUT SCENARIO")
+        print("=" * 80)
+
+        if not self.tester.authenticate():
+            print("❌ Authentication failed. Cannot run scenario.")
+            return False
+        if not self.setup_fixtures():
+            self.cleanup_fixtures()
+            print("❌ Fixture setup failed. Cannot run scenario.")
+            return False
+
+        stop_event = threading.Event()
+        readers = [threading.Thread(target=self._pos_reader, args=(stop_event,), daemon=True)
+                   for _ in range(self.pos_readers)]
+        for reader in readers:
+            reader.start()
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [executor.submit(self.run_lifecycle, index) for index in range(self.po_count)]
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self._record_failure(-1, 'lifecycle', str(e))
+            self.wall_time = time.perf_counter() - start
+        finally:
+            stop_event.set()
+            for reader in readers:
+                reader.join()
+            self.cleanup_fixtures()
+
+        self.print_report()
+        return not self.failures
+
+    def print_report(self):
+        """Print transition, visibility and POS impact summaries"""
+        print("\n" + "=" * 80)
+        print("SCENARIO RESULTS")
+        print("=" * 80)
+        print(f"Purchase orders: {self.po_count} (concurrency {self.concurrency})")
+        print(f"Completed: {self.completed}")
+        print(f"Failed: {len(self.failures)}")
+        if self.wall_time:
+            print(f"Throughput: {self.completed / self.wall_time:.2f} PO/s over {self.wall_time:.1f}s")
+
+        print_latency_table("Per-transition latency (ms)", self.transition_latencies)
+        print_latency_table("Receive -> stock visible (ms)", {'visibility': self.visibility_latencies})
+
+        phases = {phase: [read['latency'] for read in self.pos_reads if read['phase'] == phase]
+                  for phase in ['idle', 'receive', 'polling']}
+        print_latency_table("POS reads (ms)", {
+            'idle': phases['idle'],
+            'during receive call': phases['receive'],
+            'during visibility polling': phases['polling'],
+        })
+        errors = sum(1 for read in self.pos_reads if not read['ok'])
+        print(f"  POS read errors: {errors}/{len(self.pos_reads)}")
+
+        idle_p95 = summarize(phases['idle'])['p95']
+        busy_p95 = summarize(phases['receive'])['p95']
+        if idle_p95 and busy_p95:
+            print(f"  POS p95 slowdown while receiving: {busy_p95 / idle_p95:.2f}x "
+                  f"({format_ms(idle_p95)} -> {format_ms(busy_p95)} ms)")
+
+        if self.failures:
+            print("\n❌ FAILURES:")
+            for failure in self.failures[:20]:
+                print(f"  - PO #{failure['po']} {failure['transition']}: {failure['message']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purchase order lifecycle throughput scenario")
+    parser.add_argument("--pos", type=int, default=20, help="number of purchase orders")
+    parser.add_argument("--concurrency", type=int, default=5, help="purchase orders in flight")
+    parser.add_argument("--readers", type=int, default=2, help="concurrent POS readers")
+    parser.add_argument("--quantity", type=int, default=5, help="units ordered per PO")
+    parser.add_argument("--visibility-timeout", type=float, default=30.0,
+                        help="seconds to wait for received stock to appear")
+    parser.add_argument("--base-url", help="override the API base URL")
+    args = parser.parse_args()
+
+    tester = ProductManagementTester()
+    if args.base_url:
+        tester.base_url = args.base_url
+    driver = PurchaseOrderScenarioDriver(tester, po_count=args.pos, concurrency=args.concurrency,
+                                         pos_readers=args.readers, quantity=args.quantity,
+                                         visibility_timeout=args.visibility_timeout)
+    driver.run()
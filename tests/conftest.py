@@ -0,0 +1,160 @@
+"""
+Fixtures for the product management backend suite.
+
+Authentication and reference data (category, brand, branch) are created once
+per test session and shared; every product a test needs is created by the
+`product` fixture and deleted afterwards. All names carry the session's run ID
+so parallel workers and concurrent CI runs never collide.
+
+Parallel:  pytest -n auto            (requires pytest-xdist)
+Sharded:   pytest --num-shards 4 --shard-id 0
+Offline:   pytest --allow-offline    (skip backend tests instead of failing)
+"""
+
+import os
+import uuid
+import zlib
+
+import pytest
+import requests
+
+from backend_test import BASE_URL, ProductManagementTester
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("backend")
+    group.addoption("--backend-url", default=os.environ.get("BACKEND_URL", BASE_URL),
+                    help="API base URL (default: $BACKEND_URL or backend_test.BASE_URL)")
+    group.addoption("--num-shards", type=int, default=int(os.environ.get("TEST_NUM_SHARDS", 1)),
+                    help="split the suite into this many shards")
+    group.addoption("--shard-id", type=int, default=int(os.environ.get("TEST_SHARD_ID", 0)),
+                    help="which shard (0-based) to run")
+    group.addoption("--allow-offline", action="store_true",
+                    default=os.environ.get("ALLOW_OFFLINE", "") not in ("", "0"),
+                    help="skip backend tests when the backend is unreachable instead of failing "
+                         "(default: $ALLOW_OFFLINE); for local runs only, never in the deploy gate")
+
+
+def pytest_collection_modifyitems(config, items):
+    num_shards = config.getoption("num_shards")
+    shard_id = config.getoption("shard_id")
+    if num_shards <= 1:
+        return
+    if not 0 <= shard_id < num_shards:
+        raise pytest.UsageError(f"--shard-id must be between 0 and {num_shards - 1}")
+
+    # Hash node IDs so shard membership is stable across machines and runs
+    selected, deselected = [], []
+    for item in items:
+        shard = zlib.crc32(item.nodeid.encode("utf-8")) % num_shards
+        (selected if shard == shard_id else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope="session")
+def run_id():
+    """Unique per session (and so per xdist worker)"""
+    return uuid.uuid4().hex[:8]
+
+
+@pytest.fixture(scope="session")
+def tester(request):
+    """Authenticated ProductManagementTester shared by the whole session"""
+    tester = ProductManagementTester()
+    tester.base_url = request.config.getoption("backend_url")
+    try:
+        tester.session.get(f"{tester.base_url}/init", timeout=15)
+    except requests.RequestException as e:
+        # A down or overloaded backend must fail the gate, not pass it as skipped
+        if request.config.getoption("allow_offline"):
+            pytest.skip(f"Backend unreachable at {tester.base_url}: {e}")
+        pytest.fail(f"Backend unreachable at {tester.base_url}: {e}", pytrace=False)
+    if not tester.authenticate():
+        pytest.fail("Authentication failed", pytrace=False)
+    yield tester
+    tester.session.close()
+
+
+@pytest.fixture(scope="session")
+def reference_data(tester, run_id):
+    """Category, brand and branch created once and shared by product tests"""
+    if not tester.setup_test_data(suffix=f"-{run_id}"):
+        tester.cleanup_test_data()
+        pytest.fail("Reference data setup failed", pytrace=False)
+    yield {
+        "category_id": tester.created_categories[0],
+        "brand_id": tester.created_brands[0],
+        "branch_id": tester.created_branches[0],
+    }
+    tester.cleanup_test_data()
+
+
+@pytest.fixture
+def api(tester):
+    """Call the API with the session token: api("get", "/products")"""
+    def call(method, path, **kwargs):
+        return tester.session.request(method.upper(), f"{tester.base_url}{path}",
+                                      headers=tester.get_headers(), **kwargs)
+    return call
+
+
+@pytest.fixture
+def product_data(reference_data, run_id):
+    """Factory for product payloads isolated by run ID"""
+    def build(name="Test Product", **overrides):
+        data = {
+            "name": f"{name} {run_id}",
+            "category_id": reference_data["category_id"],
+            "brand_id": reference_data["brand_id"],
+            "compatible_models": "Universal",
+            "uom": "Piece",
+            "purchase_price": 25.00,
+            "price_levels": {
+                "retail": 49.99,
+                "wholesale": 40.00,
+                "member": 45.00
+            },
+            "is_active": True
+        }
+        data.update(overrides)
+        return data
+    return build
+
+
+@pytest.fixture
+def create_product(api):
+    """Create products through the API and delete them after the test"""
+    created = []
+
+    def create(data):
+        response = api("post", "/products/create", json=data)
+        assert response.status_code == 200, response.text
+        product = response.json()
+        created.append(product["id"])
+        return product
+
+    yield create
+    for product_id in created:
+        try:
+            api("post", f"/products/{product_id}/delete")
+        except requests.RequestException:
+            pass
+
+
+@pytest.fixture
+def product(create_product, product_data, reference_data):
+    """A fully populated product owned by a single test"""
+    return create_product(product_data(
+        "Honda CBR 600RR Brake Pad",
+        compatible_models="CBR 600RR 2013-2020",
+        uom="Set",
+        purchase_price=45.50,
+        price_levels={"retail": 89.99, "wholesale": 75.00, "member": 80.00},
+        technical_specs="Organic brake pad compound, high temperature resistance",
+        storage_location="A1-B2-C3",
+        tags=["brake", "safety", "honda"],
+        labels=["bestseller", "premium"],
+        stock_per_branch={reference_data["branch_id"]: 25},
+    ))
@@ -0,0 +1,63 @@
+"""
+Offline tests for the adaptive concurrency controller; no backend required.
+"""
+
+import pytest
+
+from adaptive_load import AdaptiveConcurrencyController, is_error
+
+
+def window(p99=100.0, p50=50.0, error_rate=0.0, count=100):
+    return {'count': count, 'p50': p50, 'p99': p99, 'error_rate': error_rate}
+
+
+@pytest.mark.parametrize("status, error", [(0, True), (200, False), (201, False), (401, True), (503, True)])
+def test_is_error(status, error):
+    assert is_error(status) is error
+
+
+def test_aimd_increases_additively_while_healthy():
+    controller = AdaptiveConcurrencyController('aimd', target_p99_ms=800.0, increase=2)
+
+    assert [controller.update(window()) for _ in range(3)] == [3, 5, 7]
+
+
+@pytest.mark.parametrize("unhealthy", [window(p99=900.0), window(error_rate=0.05)])
+def test_aimd_decreases_multiplicatively_on_latency_or_errors(unhealthy):
+    controller = AdaptiveConcurrencyController('aimd', target_p99_ms=800.0, target_error_rate=0.01)
+    controller.limit = 20
+
+    assert controller.update(unhealthy) == 10
+
+
+def test_limit_stays_within_bounds():
+    controller = AdaptiveConcurrencyController('aimd', min_limit=2, max_limit=4)
+
+    assert controller.update(window(p99=5000.0)) == 2
+    assert [controller.update(window()) for _ in range(3)] == [3, 4, 4]
+
+
+def test_empty_window_keeps_the_limit():
+    controller = AdaptiveConcurrencyController('aimd')
+    controller.limit = 7
+
+    assert controller.update(window(p99=None, p50=None, count=0)) == 7
+
+
+def test_gradient_probes_upward_at_minimum_latency():
+    controller = AdaptiveConcurrencyController('gradient', max_limit=64)
+    controller.limit = 16
+
+    # gradient 1.0 plus sqrt(16) headroom
+    assert controller.update(window(p50=50.0)) == 20
+
+
+def test_gradient_shrinks_as_latency_drifts_from_minimum():
+    controller = AdaptiveConcurrencyController('gradient', max_limit=64)
+    controller.limit = 16
+    controller.update(window(p50=50.0))
+
+    # p50 doubled: gradient 0.5 gives 20 * 0.5 + sqrt(20)
+    assert controller.update(window(p50=100.0)) == 14
+    # over the target: cut by the smaller of gradient and decrease
+    assert controller.update(window(p50=100.0, p99=900.0)) == 7
@@ -0,0 +1,71 @@
+"""
+Offline tests for the payload profiler helpers; no backend required.
+"""
+
+import pytest
+
+from payload_profiler import collection_key, encode, extract_rows, field_breakdown, sparse_projection
+
+PRODUCT = {
+    "id": "p1",
+    "name": "Brake Pad",
+    "tags": [],
+    "volume_discounts": [{"min_quantity": 10}],
+    "price_levels": {"retail": 89.99},
+}
+
+
+@pytest.mark.parametrize("product", [
+    PRODUCT,
+    {key: PRODUCT[key] for key in reversed(list(PRODUCT))},
+])
+def test_extract_rows_treats_single_object_as_one_row(product):
+    assert extract_rows({"success": True, "data": product}, "products") == [product]
+
+
+def test_extract_rows_finds_paginated_collection():
+    rows = [{"id": "p1"}, {"id": "p2"}]
+    payload = {"success": True, "data": {"products": rows, "pagination": {"total": 2}}}
+
+    assert extract_rows(payload, "products") == rows
+
+
+def test_extract_rows_ignores_nested_lists_without_pagination():
+    report = {"products": [{"id": "p1"}], "summary": {"total_products": 1}}
+
+    assert extract_rows(report, "margin-report") == [report]
+
+
+def test_extract_rows_accepts_bare_lists():
+    assert extract_rows([{"id": "p1"}, "noise"]) == [{"id": "p1"}]
+    assert extract_rows("not json rows") == []
+
+
+@pytest.mark.parametrize("endpoint, key", [
+    ("/products", "products"),
+    ("/products?search=Honda", "products"),
+    ("/products/${id}", None),
+    ("/", None),
+])
+def test_collection_key(endpoint, key):
+    assert collection_key(endpoint) == key
+
+
+def test_field_breakdown_sums_key_and_value_bytes_across_rows():
+    rows = [{"id": "p1", "tags": ["a"]}, {"id": "p22"}]
+
+    assert field_breakdown(rows) == {
+        "id": 2 * len(encode("id")) + len(encode("p1")) + len(encode("p22")) + 4,
+        "tags": len(encode("tags")) + len(encode(["a"])) + 2,
+    }
+
+
+def test_sparse_projection_keeps_scalars_by_default():
+    assert sparse_projection([PRODUCT]) == [{"id": "p1", "name": "Brake Pad"}]
+
+
+def test_sparse_projection_keeps_requested_fields_that_exist():
+    assert sparse_projection([PRODUCT, {"id": "p2"}], ["id", "price_levels"]) == [
+        {"id": "p1", "price_levels": {"retail": 89.99}},
+        {"id": "p2"},
+    ]
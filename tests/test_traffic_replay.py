@@ -0,0 +1,110 @@
+"""
+Offline tests for the record-and-replay helpers; no backend required.
+"""
+
+import gzip
+
+import pytest
+
+from traffic_replay import (SCRUBBED, RecordingSession, ReplayEngine, StandInBackend,
+                            endpoint_key, load_cassette, remap, save_cassette, scrub)
+
+
+def test_scrub_replaces_credentials_at_any_depth():
+    value = {
+        "username": "admin",
+        "Password": "admin123",
+        "data": {"accessToken": "abc", "refreshToken": "def", "user": {"id": "u1"}},
+        "sessions": [{"token": "ghi", "device": "pos-1"}],
+    }
+
+    assert scrub(value) == {
+        "username": "admin",
+        "Password": SCRUBBED,
+        "data": {"accessToken": SCRUBBED, "refreshToken": SCRUBBED, "user": {"id": "u1"}},
+        "sessions": [{"token": SCRUBBED, "device": "pos-1"}],
+    }
+
+
+def test_scrub_leaves_non_credential_values_untouched():
+    assert scrub(["a", 1, None]) == ["a", 1, None]
+    assert scrub("token") == "token"
+
+
+@pytest.mark.parametrize("method, path, key", [
+    ("GET", "/products", "GET /products"),
+    ("GET", "/products?search=Honda", "GET /products"),
+    ("POST", "/products/0623cd62-a1f3-4ecd-9d24-4fc98137c5c0/promo", "POST /products/{id}/promo"),
+    ("GET", "/transactions/42", "GET /transactions/{id}"),
+    ("GET", "/products/margin-report", "GET /products/margin-report"),
+])
+def test_endpoint_key_templates_ids(method, path, key):
+    assert endpoint_key(method, path) == key
+
+
+def test_cassette_round_trip(tmp_path):
+    exchanges = [
+        {"method": "GET", "path": "/products", "request": None, "status": 200,
+         "elapsed_ms": 12.5, "t": 40.0, "gap_ms": 40.0},
+        {"method": "POST", "path": "/products/create", "request": {"name": "Brake Pad"},
+         "status": 200, "elapsed_ms": 30.1, "t": 0.0, "gap_ms": 0.0},
+    ]
+    path = str(tmp_path / "day.cassette")
+
+    save_cassette(path, exchanges, base_url="http://backend/api")
+    header, loaded = load_cassette(path)
+
+    assert header["base_url"] == "http://backend/api"
+    assert header["exchanges"] == 2
+    assert loaded == sorted(exchanges, key=lambda exchange: exchange["t"])
+
+
+def test_load_cassette_rejects_unknown_version(tmp_path):
+    path = str(tmp_path / "future.cassette")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write('{"version":99}\n')
+
+    with pytest.raises(ValueError):
+        load_cassette(path)
+
+
+def test_recording_session_scrubs_what_it_records():
+    backend = StandInBackend([
+        {"method": "POST", "path": "/auth/login", "status": 200, "elapsed_ms": 1.0,
+         "content_type": "application/json", "response": {"accessToken": "secret-token"}, "t": 0.0},
+    ]).start()
+    try:
+        session = RecordingSession(backend.url)
+        session.post(f"{backend.url}/auth/login", json={"username": "admin", "password": "admin123"})
+    finally:
+        backend.stop()
+
+    exchange, = session.exchanges
+    assert exchange["path"] == "/auth/login"
+    assert exchange["request"] == {"username": "admin", "password": SCRUBBED}
+    assert exchange["response"] == {"accessToken": SCRUBBED}
+
+
+def test_remap_rewrites_paths_keys_and_values():
+    id_map = {"old-product": "new-product", "old-branch": "new-branch"}
+
+    assert remap("/products/old-product/stock", id_map) == "/products/new-product/stock"
+    assert remap({"branch_id": "old-branch", "stock_per_branch": {"old-branch": 5}}, id_map) == \
+        {"branch_id": "new-branch", "stock_per_branch": {"new-branch": 5}}
+
+
+def test_replay_skips_writes_and_their_dependents_by_default():
+    exchanges = [
+        {"method": "POST", "path": "/products/create", "request": {"name": "x"}, "status": 200,
+         "response": {"id": "rec-1"}, "t": 0.0},
+        {"method": "GET", "path": "/products/rec-1", "request": None, "status": 200, "t": 1.0},
+        {"method": "GET", "path": "/products", "request": None, "status": 200, "t": 2.0},
+    ]
+
+    read_only = ReplayEngine(exchanges, "http://backend/api")
+    with_writes = ReplayEngine(exchanges, "http://backend/api", include_writes=True)
+
+    assert [exchange["path"] for exchange in read_only.exchanges] == ["/products"]
+    assert read_only.skipped == {"writes": 1, "depends on recorded writes": 1}
+    assert len(with_writes.exchanges) == 3
+    assert with_writes.waits == [[], [0], []]
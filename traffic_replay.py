@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Record-and-Replay Traffic Capture
+RecordingSession captures the request/response exchanges made through
+ProductManagementTester (run `backend_test.py --record day.cassette`) into a
+gzipped JSON-lines cassette with credentials scrubbed. The replay engine drives
+a cassette against any base URL, or against a local stand-in backend that
+serves the recorded responses, at 1x, 10x or as fast as possible. The
+compare command reports latency distributions between two runs.
+
+Replay is read-only by default. With --include-writes, ids handed out by
+recorded creates are mapped to the ids the target returns, and later paths
+and bodies are rewritten to match.
+"""
+
+import argparse
+import gzip
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+from perf_utils import format_ms, print_latency_table, summarize, unwrap
+
+CASSETTE_VERSION = 1
+SCRUBBED = "***"
+SENSITIVE_KEYS = {'password', 'token', 'accesstoken', 'refreshtoken', 'authorization'}
+# Replaying these would send scrubbed credentials; the engine logs in itself
+SKIP_PREFIXES = ('/auth/', '/init')
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$")
+
+
+def scrub(value):
+    """Recursively replace credential fields in a JSON value"""
+    if isinstance(value, dict):
+        return {key: SCRUBBED if key.lower() in SENSITIVE_KEYS else scrub(item)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    return value
+
+
+def endpoint_key(method, path):
+    """Group a concrete request under a templated key, e.g. GET /products/{id}"""
+    segments = urlsplit(path).path.split('/')
+    return f"{method} " + '/'.join('{id}' if ID_SEGMENT.match(segment) else segment
+                                   for segment in segments)
+
+
+def _json_or_text(raw, content_type):
+    if raw is None or raw == b'':
+        return None
+    if 'json' in (content_type or ''):
+        try:
+            return scrub(json.loads(raw))
+        except ValueError:
+            pass
+    return raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+
+
+class RecordingSession(requests.Session):
+    """requests.Session that records every exchange for later replay"""
+
+    def __init__(self, base_url=None, record_bodies=True):
+        super().__init__()
+        self.base_url = base_url
+        self.record_bodies = record_bodies
+        self.exchanges = []
+        self.started_at = None
+        self.lock = threading.Lock()
+
+    def _relative_path(self, url):
+        if self.base_url and url.startswith(self.base_url):
+            return url[len(self.base_url):] or '/'
+        parts = urlsplit(url)
+        return parts.path + (f"?{parts.query}" if parts.query else '')
+
+    def request(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            self._record(method, url, kwargs, None, start)
+            raise
+        self._record(method, response.request.url, kwargs, response, start)
+        return response
+
+    def _record(self, method, url, kwargs, response, start):
+        elapsed = (time.perf_counter() - start) * 1000
+        body = kwargs.get('json')
+        exchange = {
+            'method': method.upper(),
+            'path': self._relative_path(url),
+            'request': scrub(body) if body is not None else None,
+            'status': response.status_code if response is not None else 0,
+            'elapsed_ms': round(elapsed, 3),
+        }
+        if response is not None and self.record_bodies:
+            exchange['content_type'] = response.headers.get('Content-Type')
+            exchange['response'] = _json_or_text(response.content, exchange['content_type'])
+
+        with self.lock:
+            if self.started_at is None:
+                self.started_at = start
+            exchange['t'] = round((start - self.started_at) * 1000, 3)
+            exchange['gap_ms'] = round(exchange['t'] - self.exchanges[-1]['t'], 3) if self.exchanges else 0.0
+            self.exchanges.append(exchange)
+
+    def save(self, path):
+        save_cassette(path, self.exchanges, base_url=self.base_url)
+
+
+def save_cassette(path, exchanges, base_url=None):
+    """Write a header line followed by one exchange per line, gzipped"""
+    header = {'version': CASSETTE_VERSION, 'recorded_at': datetime.now().isoformat(),
+              'base_url': base_url, 'exchanges': len(exchanges)}
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(header, separators=(',', ':')) + '\n')
+        for exchange in exchanges:
+            f.write(json.dumps(exchange, separators=(',', ':'), ensure_ascii=False) + '\n')
+
+
+def load_cassette(path):
+    """Return (header, exchanges) sorted by start offset"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get('version') != CASSETTE_VERSION:
+        raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+    return lines[0], sorted(lines[1:], key=lambda exchange: exchange['t'])
+
+
+def created_id(exchange):
+    """Return the id a recorded POST handed back, if its response carries one"""
+    if exchange['method'] != 'POST' or not isinstance(exchange.get('response'), dict):
+        return None
+    body = unwrap(exchange['response'])
+    if isinstance(body, dict) and isinstance(body.get('id'), str):
+        return body['id']
+    return None
+
+
+def remap(value, id_map):
+    """Replace every recorded id in a path or JSON value with its replayed id"""
+    if isinstance(value, str):
+        for recorded, replayed in id_map.items():
+            if recorded in value:
+                value = value.replace(recorded, replayed)
+        return value
+    if isinstance(value, dict):
+        return {remap(key, id_map): remap(item, id_map) for key, item in value.items()}
+    if isinstance(value, list):
+        return [remap(item, id_map) for item in value]
+    return value
+
+
+def _references(exchange):
+    return exchange['path'] + json.dumps(exchange.get('request'))
+
+
+class ReplayEngine:
+    def __init__(self, exchanges, target_url, speed=1.0, concurrency=16, token=None,
+                 skip_prefixes=SKIP_PREFIXES, include_writes=False, dependency_timeout=30.0):
+        exchanges = [exchange for exchange in exchanges
+                     if not exchange['path'].startswith(skip_prefixes)]
+        self.target_url = target_url.rstrip('/')
+        self.speed = speed
+        self.concurrency = concurrency
+        self.token = token
+        self.include_writes = include_writes
+        self.dependency_timeout = dependency_timeout
+        self.results = []
+        self.wall_time = 0.0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+        # Recorded ids first seen in a create response; anything that
+        # references one depends on that create having been replayed
+        candidates = {}
+        for index, exchange in enumerate(exchanges):
+            new_id = created_id(exchange)
+            if new_id and new_id not in candidates and new_id not in _references(exchange):
+                candidates[new_id] = index
+        self.creators = {recorded: index for recorded, index in candidates.items()
+                         if not any(recorded in _references(earlier) for earlier in exchanges[:index])}
+        self.id_map = {}
+
+        self.exchanges = []
+        self.skipped = {'writes': 0, 'depends on recorded writes': 0}
+        for exchange in exchanges:
+            if not include_writes and exchange['method'] in WRITE_METHODS:
+                self.skipped['writes'] += 1
+            elif not include_writes and self._touched(exchange):
+                self.skipped['depends on recorded writes'] += 1
+            else:
+                self.exchanges.append(exchange)
+
+        # Exchanges touching the same created resource run in recorded order,
+        # so a replayed delete never overtakes the update before it
+        self.done = [threading.Event() for _ in self.exchanges]
+        self.waits = []
+        last = {}
+        for index, exchange in enumerate(self.exchanges):
+            touched = self._touched(exchange)
+            self.waits.append(sorted({last[recorded] for recorded in touched if recorded in last}))
+            for recorded in touched:
+                last[recorded] = index
+
+    def _touched(self, exchange):
+        """Recorded ids of created resources this exchange creates or references"""
+        references = _references(exchange)
+        return [recorded for recorded in self.creators
+                if recorded in references or recorded == created_id(exchange)]
+
+    def _session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def _headers(self):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return headers
+
+    def _send(self, index, exchange, scheduled_at):
+        for earlier in self.waits[index]:
+            self.done[earlier].wait(self.dependency_timeout)
+        lag = (time.perf_counter() - scheduled_at) * 1000
+        with self.lock:
+            id_map = dict(self.id_map)
+        recorded_id = created_id(exchange)
+
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._session().request(exchange['method'],
+                                               self.target_url + remap(exchange['path'], id_map),
+                                               json=remap(exchange.get('request'), id_map),
+                                               headers=self._headers())
+            status = response.status_code
+        except Exception:
+            status = 0
+        finally:
+            if recorded_id in self.creators:
+                self._map_created(recorded_id, response)
+            self.done[index].set()
+        result = {
+            'key': endpoint_key(exchange['method'], exchange['path']),
+            'status': status,
+            'recorded_status': exchange.get('status'),
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+            'lag_ms': round(lag, 3),
+        }
+        with self.lock:
+            self.results.append(result)
+
+    def _map_created(self, recorded_id, response):
+        """Remember the id the target assigned in place of recorded_id"""
+        try:
+            if response is not None and response.status_code in (200, 201):
+                body = unwrap(response.json())
+                if isinstance(body, dict) and body.get('id'):
+                    with self.lock:
+                        self.id_map[recorded_id] = str(body['id'])
+        except ValueError:
+            pass
+
+    def run(self):
+        """Replay every exchange at its recorded offset divided by speed (0 = asap)"""
+        if not self.exchanges:
+            return self.results
+        first_offset = self.exchanges[0]['t']
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for index, exchange in enumerate(self.exchanges):
+                due = start
+                if self.speed:
+                    due += (exchange['t'] - first_offset) / 1000 / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._send, index, exchange, due)
+        self.wall_time = time.perf_counter() - start
+        return self.results
+
+    def print_report(self):
+        by_key = {}
+        failed = {}
+        for result in self.results:
+            if 200 <= result['status'] < 400:
+                by_key.setdefault(result['key'], []).append(result['latency_ms'])
+            else:
+                statuses = failed.setdefault(result['key'], {})
+                statuses[result['status']] = statuses.get(result['status'], 0) + 1
+        print_latency_table("Replay latency, successful responses (ms)", dict(sorted(by_key.items())))
+
+        if failed:
+            print("\nFailed responses (excluded from latency):")
+            for key, statuses in sorted(failed.items()):
+                counts = ", ".join(f"{status or 'no response'} x{count}"
+                                   for status, count in sorted(statuses.items()))
+                print(f"  {key:<40} {counts}")
+
+        total_failed = sum(sum(statuses.values()) for statuses in failed.values())
+        mismatched = sum(1 for result in self.results if result['status'] != result['recorded_status'])
+        lag = summarize([result['lag_ms'] for result in self.results])
+        print(f"\nReplayed {len(self.results)} exchanges in {self.wall_time:.1f}s "
+              f"(speed {'asap' if not self.speed else f'{self.speed:g}x'})")
+        for reason, count in self.skipped.items():
+            if count:
+                print(f"Skipped ({reason}): {count}")
+        print(f"Failed responses: {total_failed}")
+        print(f"Status mismatches vs recording: {mismatched}")
+        print(f"Scheduling lag p95: {format_ms(lag['p95'])} ms")
+        if self.results and total_failed / len(self.results) > 0.05:
+            print(f"⚠️  {total_failed / len(self.results) * 100:.0f}% of replayed requests failed - "
+                  f"latency above covers successful responses only")
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'target_url': self.target_url, 'speed': self.speed,
+                       'results': self.results}, f, indent=2)
+
+
+class StandInBackend:
+    """Local HTTP server answering requests with the responses from a cassette"""
+
+    def __init__(self, exchanges, host='127.0.0.1', port=0, simulate_latency=False):
+        self.routes = {}
+        for exchange in exchanges:
+            if 'response' in exchange:
+                self.routes.setdefault((exchange['method'], exchange['path']), []).append(exchange)
+        self.cursors = {}
+        self.lock = threading.Lock()
+        self.simulate_latency = simulate_latency
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def lookup(self, method, path):
+        """Return recorded exchanges for a route in round-robin order"""
+        candidates = self.routes.get((method, path))
+        if not candidates:
+            return None
+        with self.lock:
+            index = self.cursors.get((method, path), 0)
+            self.cursors[(method, path)] = index + 1
+        return candidates[index % len(candidates)]
+
+    def _handler_class(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                exchange = backend.lookup(self.command, self.path)
+                if exchange is None:
+                    status, body, content_type = 404, {'success': False, 'message': 'Not recorded'}, 'application/json'
+                else:
+                    status, body = exchange['status'], exchange['response']
+                    content_type = exchange.get('content_type') or 'application/json'
+                    if backend.simulate_latency:
+                        time.sleep(exchange['elapsed_ms'] / 1000)
+                payload = b'' if body is None else (
+                    body.encode('utf-8') if isinstance(body, str) else json.dumps(body).encode('utf-8'))
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def load_latencies(path):
+    """Return {endpoint key: latencies} from a cassette or a replay result file"""
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            rows = [(result['key'], result['latency_ms']) for result in json.load(f)['results']]
+    else:
+        _, exchanges = load_cassette(path)
+        rows = [(endpoint_key(exchange['method'], exchange['path']), exchange['elapsed_ms'])
+                for exchange in exchanges]
+    latencies = {}
+    for key, latency in rows:
+        latencies.setdefault(key, []).append(latency)
+    return latencies
+
+
+def compare_runs(baseline_path, candidate_path):
+    """Print per-endpoint percentile deltas between two runs"""
+    baseline = load_latencies(baseline_path)
+    candidate = load_latencies(candidate_path)
+
+    print(f"\nBaseline: {baseline_path}")
+    print(f"Candidate: {candidate_path}")
+    print(f"\n  {'endpoint':<40} {'p50 A':>9} {'p50 B':>9} {'p95 A':>9} {'p95 B':>9} "
+          f"{'p99 A':>9} {'p99 B':>9} {'p95 B/A':>8}")
+    for key in sorted(set(baseline) | set(candidate)):
+        a = summarize(baseline.get(key, []))
+        b = summarize(candidate.get(key, []))
+        ratio = f"{b['p95'] / a['p95']:.2f}x" if a['p95'] and b['p95'] else "-"
+        print(f"  {key:<40} {format_ms(a['p50']):>9} {format_ms(b['p50']):>9} "
+              f"{format_ms(a['p95']):>9} {format_ms(b['p95']):>9} "
+              f"{format_ms(a['p99']):>9} {format_ms(b['p99']):>9} {ratio:>8}")
+
+
+def _speed(value):
+    if value in ('asap', 'max', '0'):
+        return 0.0
+    return float(value.rstrip('x'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay and compare recorded backend traffic")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay = commands.add_parser('replay', help="replay a cassette against a backend")
+    replay.add_argument('cassette')
+    target = replay.add_mutually_exclusive_group()
+    target.add_argument('--target', help="base URL to replay against (default: recorded base URL)")
+    target.add_argument('--standin', action='store_true',
+                        help="replay against a local stand-in serving the recorded responses")
+    replay.add_argument('--speed', type=_speed, default=1.0, help="1x, 10x, ... or asap")
+    replay.add_argument('--concurrency', type=int, default=16)
+    replay.add_argument('--simulate-latency', action='store_true',
+                        help="stand-in sleeps for each recorded response time")
+    replay.add_argument('--include-writes', action='store_true',
+                        help="also replay POST/PUT/PATCH/DELETE, remapping created ids "
+                             "(always on with --standin)")
+    replay.add_argument('--out', help="write replay results to a .json file for compare")
+
+    serve = commands.add_parser('serve', help="run the stand-in backend for a cassette")
+    serve.add_argument('cassette')
+    serve.add_argument('--port', type=int, default=8099)
+    serve.add_argument('--simulate-latency', action='store_true')
+
+    compare = commands.add_parser('compare', help="compare latency between two runs")
+    compare.add_argument('baseline', help="cassette or replay .json")
+    compare.add_argument('candidate', help="cassette or replay .json")
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        compare_runs(args.baseline, args.candidate)
+    elif args.command == 'serve':
+        _, exchanges = load_cassette(args.cassette)
+        backend = StandInBackend(exchanges, port=args.port, simulate_latency=args.simulate_latency)
+        print(f"Serving {len(backend.routes)} recorded routes at {backend.url} (Ctrl+C to stop)")
+        try:
+            backend.server.serve_forever()
+        except KeyboardInterrupt:
+            backend.server.server_close()
+    else:
+        header, exchanges = load_cassette(args.cassette)
+        backend = None
+        token = None
+        if args.standin:
+            backend = StandInBackend(exchanges, simulate_latency=args.simulate_latency).start()
+            target_url = backend.url
+        else:
+            from backend_test import ProductManagementTester
+
+            target_url = args.target or header.get('base_url')
+            tester = ProductManagementTester()
+            tester.base_url = target_url
+            if not tester.authenticate():
+                print("❌ Authentication failed. Cannot replay against target.")
+                raise SystemExit(1)
+            token = tester.token
+
+        print("=" * 80)
+        print(f"REPLAYING {len(exchanges)} EXCHANGES AGAINST {target_url}")
+        print("=" * 80)
+        engine = ReplayEngine(exchanges, target_url, speed=args.speed,
+                              concurrency=args.concurrency, token=token,
+                              include_writes=args.include_writes or args.standin)
+        try:
+            engine.run()
+        finally:
+            if backend is not None:
+                backend.stop()
+        engine.print_report()
+        if args.out:
+            engine.save(args.out)
+            print(f"Results written to {args.out}")